@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+# The above line allows this file to be executable (shebang)
+
+# Jordan Dehmel, 2023
+# jdehmel@outlook.com
+# jedehmel@mavs.coloradomesa.edu
+
+'''
+Measures what multi-window mode saves. The given screens are
+first run as one main.py process each (the old way of putting
+two views on two monitors), then as a single main.py driving
+all of them. Each setup runs for a while, then its memory and
+CPU use are read from /proc and the two are printed side by
+side.
+
+The windows go fullscreen while this runs, so run it on the
+kiosk itself, for instance:
+    python3 benchmark.py first fifth
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# This file uses Python's type hinting as much as possible
+
+# The folder this exhibit lives in
+here: str = os.path.dirname(os.path.abspath(__file__))
+
+
+# Get a process's memory use in bytes. The proportional set size
+# splits shared libraries between the processes using them, so
+# adding it up over several processes gives their real total.
+# Falls back to the resident set size on older kernels.
+def process_memory(pid: int) -> int:
+    for path, key in [("/proc/" + str(pid) + "/smaps_rollup", "Pss:"),
+                      ("/proc/" + str(pid) + "/status", "VmRSS:")]:
+        try:
+            with open(path) as file:
+                for line in file:
+                    if line.startswith(key):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+    return 0
+
+
+# Get a process's user and system CPU time, in seconds
+def process_cpu(pid: int) -> float:
+    with open("/proc/" + str(pid) + "/stat") as file:
+        # The command name may hold spaces, so split after it
+        fields: list = file.read().rsplit(")", 1)[1].split()
+
+    # utime and stime are fields 14 and 15 of the whole line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+# Start the given main.py command lines together, let them run,
+# then return their combined memory (bytes) and CPU (seconds)
+def measure(commands: list, seconds: float) -> tuple:
+    processes: list = [subprocess.Popen([sys.executable, "main.py", *args],
+                                        cwd=here)
+                       for args in commands]
+
+    try:
+        time.sleep(seconds)
+
+        for process in processes:
+            if process.poll() is not None:
+                raise RuntimeError("main.py " + " ".join(process.args[2:])
+                                   + " exited early; is there a display?")
+
+        memory: int = sum(process_memory(p.pid) for p in processes)
+        cpu: float = sum(process_cpu(p.pid) for p in processes)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    return memory, cpu
+
+
+# Format a number of bytes as megabytes
+def megabytes(what: float) -> str:
+    return str(round(what / (1024 * 1024), 1)) + " MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare one process per window against one shared"
+                    + " process.")
+    parser.add_argument("screens", nargs="*", default=["first", "fifth"],
+                        help="the screens to show (default: first fifth)")
+    parser.add_argument("--seconds", type=float, default=30.0,
+                        help="how long to run each setup (default: 30)")
+    args = parser.parse_args()
+
+    count: int = len(args.screens)
+
+    try:
+        print("Running " + str(count) + " separate processes...")
+        separate: tuple = measure([[screen] for screen in args.screens],
+                                  args.seconds)
+
+        print("Running 1 process with " + str(count) + " windows...")
+        shared: tuple = measure([args.screens], args.seconds)
+    except RuntimeError as e:
+        print("Benchmark failed:", e)
+        return
+
+    print("After " + str(args.seconds) + " s each:")
+    print("    " + str(count) + " processes: " + megabytes(separate[0])
+          + " memory, " + str(round(separate[1], 2)) + " s CPU")
+    print("    1 process:   " + megabytes(shared[0])
+          + " memory, " + str(round(shared[1], 2)) + " s CPU")
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -26,6 +26,14 @@ To close the program, simply press escape.
 After escape is pressed, the Raspberry Pi running
 it can be powered down safely and unplugged.
 
+To show several screens side by side (for instance,
+the 32-bit and 64-bit views on two monitors), list
+their names on the command line, like
+`python3 main.py first fifth`. All the windows are
+run by this one program, sharing one clock and one
+copy of the images. To compare this against running one
+program per window, use benchmark.py.
+
 This program and all associated source code files
 are FOSS under the GPLv3, a copy of which should
 be attached here. Designed for public educational
@@ -34,12 +42,22 @@ use.
 All art belongs to Jordan Dehmel.
 '''
 
+import sys
+
 from time_driver import *
 
 if __name__ == '__main__':
+    screens: list = sys.argv[1:] or ["first"]
+
+    for screen in screens:
+        if screen not in screen_names:
+            print("Unknown screen '" + screen + "'. Choose from: "
+                  + ", ".join(screen_names))
+            sys.exit(1)
+
     try:
-        window = TimeApplication()
-        window.first_screen()
+        window = TimeApplication(screens)
+        window.start()
         window.root.mainloop()
     except:
         print("Unknown failure occured.")
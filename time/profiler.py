@@ -0,0 +1,153 @@
+# Jordan Dehmel, 2023
+# jdehmel@outlook.com
+# jedehmel@mavs.coloradomesa.edu
+
+# An on-demand profiler for when a deployed kiosk gets slow.
+# Nothing runs until it is triggered, either by sending the
+# process SIGUSR1 (`pkill -USR1 -f main.py`) or by pressing
+# Ctrl+Alt+P on a plugged-in keyboard. Then, for a few
+# seconds, the main thread's stack is sampled from a
+# background thread and cProfile is switched on. The results
+# are written next to the app as:
+#     profile-<time>.folded  Collapsed stacks, for flamegraph.pl
+#     profile-<time>.prof    cProfile stats, for pstats/snakeviz
+#     profile-<time>.txt     The slowest functions, readable as-is
+
+# This file uses Python's type hinting as much as possible
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+
+# The folder this exhibit lives in, where results are written
+here: str = os.path.dirname(os.path.abspath(__file__))
+
+
+class SamplingProfiler:
+    # Initialize all needed member variables. root is the Tk
+    # window, used to schedule the end of a profiling run.
+    def __init__(self, root, seconds: float = 10.0,
+                 interval: float = 0.005) -> None:
+        self.root = root
+        self.seconds: float = seconds
+        self.interval: float = interval
+
+        self.active: bool = False
+
+        # Collapsed stack -> number of samples it was seen in
+        self.stacks: dict = {}
+
+        self.thread: threading.Thread = None
+        self.stop_event: threading.Event = threading.Event()
+        self.cprofile: cProfile.Profile = None
+
+        # The scheduled end of the current run
+        self.outgoing = ""
+
+        return
+
+    # Start listening for SIGUSR1. This costs nothing until the
+    # signal actually arrives.
+    def install(self) -> None:
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self.on_signal)
+
+        return
+
+    # Python runs signal handlers on the main thread, so it is
+    # safe to start profiling from here
+    def on_signal(self, signum, frame) -> None:
+        self.start()
+
+        return
+
+    # Called when the hidden key chord is pressed
+    def on_key(self, event) -> None:
+        self.start()
+
+        return
+
+    # Begin a profiling run, unless one is already going
+    def start(self) -> None:
+        if self.active:
+            return
+
+        print("Profiling for " + str(self.seconds) + " seconds...")
+
+        self.active = True
+        self.stacks = {}
+        self.stop_event.clear()
+
+        self.thread = threading.Thread(
+            target=self.sample, args=(threading.main_thread().ident,),
+            daemon=True)
+        self.thread.start()
+
+        # cProfile only watches the thread that enables it, which
+        # is the main (Tk) thread here
+        self.cprofile = cProfile.Profile()
+        self.cprofile.enable()
+
+        self.outgoing = self.root.after(int(self.seconds * 1000), self.stop)
+
+        return
+
+    # Runs on the background thread: every interval, record the
+    # main thread's current stack, root first
+    def sample(self, thread_id: int) -> None:
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            names: list = []
+
+            while frame is not None:
+                code = frame.f_code
+                names.append(code.co_name + " ("
+                             + os.path.basename(code.co_filename) + ":"
+                             + str(code.co_firstlineno) + ")")
+                frame = frame.f_back
+
+            stack: str = ";".join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+        return
+
+    # End a profiling run and write out its results. This may be
+    # called early (for instance, when the app closes).
+    def stop(self) -> None:
+        if not self.active:
+            return
+
+        if self.outgoing != "":
+            self.root.after_cancel(self.outgoing)
+            self.outgoing = ""
+
+        self.cprofile.disable()
+        self.stop_event.set()
+        self.thread.join()
+
+        prefix: str = os.path.join(
+            here, "profile-" + time.strftime("%Y%m%d-%H%M%S"))
+
+        try:
+            with open(prefix + ".folded", "w") as file:
+                for stack, count in sorted(self.stacks.items()):
+                    file.write(stack + " " + str(count) + "\n")
+
+            self.cprofile.dump_stats(prefix + ".prof")
+
+            with open(prefix + ".txt", "w") as file:
+                stats = pstats.Stats(self.cprofile, stream=file)
+                stats.sort_stats("cumulative").print_stats(40)
+
+            print("Wrote profile to " + prefix + ".*")
+        except OSError as e:
+            print("Failed to write profile:", e)
+
+        self.cprofile = None
+        self.active = False
+
+        return
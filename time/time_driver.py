@@ -11,8 +11,11 @@ from tkinter import font
 from ttkthemes import ThemedTk
 from PIL import Image, ImageTk
 
+import resource
 import time
 
+from profiler import SamplingProfiler
+
 # Get the trimmed & padded & byte-spaced binary version of a number, limited
 # to a certain number of bits (digits)
 
@@ -42,6 +45,24 @@ def get_bin(what: int, digits: int) -> str:
 # to demonstrate the integer overflow of 2038
 overflow_constant: int = pow(2, 31) - 10
 
+# The screens a window can start on, in the order they are shown
+screen_names: list = ["first", "second", "third", "fourth", "fifth"]
+
+
+# Get this process's current memory use, in bytes. Falls back
+# to the peak use where /proc is not available.
+def memory_used() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Format a number of bytes as megabytes
+def megabytes(what: float) -> str:
+    return str(round(what / (1024 * 1024), 1)) + " MB"
+
 # A safer version of ctime: If it is within the range
 # representable, it will return that. Otherwise, it will
 # return a rough estimate of the year (CE / BCE)
@@ -64,75 +85,40 @@ def safe_ctime(what: int) -> str:
 
     return out
 
-# The actual application running the computer time exhibit
+# One window of the exhibit. Several of these can be driven by
+# a single TimeApplication, each showing its own screen.
 
 
-class TimeApplication:
-    # Initialize all needed member variables
-    def __init__(self) -> None:
-        # Create members, but do not start window yet
-        self.root: ThemedTk = ThemedTk(theme="breeze")
-
-        temp = list(font.families())
-        temp.sort()
-
-        if "Adelle" not in temp or "Amsi Pro Narw" not in temp:
-            print("Error: Font(s) not present! Installed fonts:")
-
-            for item in temp:
-                print("'" + item + "'")
+class TimeWindow:
+    # Initialize all needed member variables. The window's
+    # widgets go in root, and shared assets come from app.
+    def __init__(self, app, root) -> None:
+        self.app = app
+        self.root = root
 
         # Activate fullscreen mode
         self.root.attributes("-fullscreen", True)
 
-        # Add background image via label
-        try:
-            # Get screen dimensions
-            self.w, self.h = self.root.winfo_screenwidth(), self.root.winfo_screenheight()
-
-            # Load unscaled image
-            temp = Image.open("images/bg.png")
-
-            # Calculate scaling factor as greatest of h and w scale factors
-            scale: float = 1.0
-
-            h_scale: float = (self.h + 10) / temp.height
-            w_scale: float = (self.w + 10) / temp.width
-
-            if h_scale > w_scale:
-                scale = h_scale
-            else:
-                scale = w_scale
-
-            # Rescale
-            temp = temp.resize(
-                size=(int(temp.width * scale), int(temp.height * scale)))
-            self.photo = ImageTk.PhotoImage(temp)
-
-            # Set scaled image as background
-            self.bg_image: ttk.Label = ttk.Label(self.root, image=self.photo)
+        # Add background image via label, if it was loaded
+        if app.photo is not None:
+            self.bg_image: ttk.Label = ttk.Label(self.root, image=app.photo)
             self.bg_image.place(x=0, y=0, relheight=1.0, relwidth=1.0)
-
-        except:
-            print("Failed to open background image")
-            self.photo = None
+        else:
             self.bg_image = None
 
-        # These images are mandatory to load, unlike the background
-        temp = Image.open("images/next_arrow.png")
-        temp = temp.resize(size=(64, 32))
-        self.next_arrow_photo = ImageTk.PhotoImage(temp)
-
-        temp = Image.open("images/restart_arrow.png")
-        temp = temp.resize(size=(64, 64))
-        self.prev_arrow_photo = ImageTk.PhotoImage(temp)
+        # These are shared between all windows
+        self.next_arrow_photo = app.next_arrow_photo
+        self.prev_arrow_photo = app.prev_arrow_photo
 
         # Add frame
         self.frame: ttk.Frame = ttk.Frame(self.root)
         self.frame.pack(padx=20, pady=190)
 
         # Set up escape
-        self.root.bind("<Escape>", func=self.close)
+        self.root.bind("<Escape>", func=app.close)
+
+        # Hidden chord for taking a profile of a slow kiosk
+        self.root.bind("<Control-Alt-p>", func=app.profiler.on_key)
 
         # Used to reduce overhead in start screen
         self.current_screen: str = "NULL"
@@ -147,8 +133,6 @@ class TimeApplication:
         self.cur_time: tk.IntVar = tk.IntVar()
         self.slider_var: float = 0.0
 
-        self.outgoing = ""
-
         return
 
     # Erase the current window
@@ -160,23 +144,21 @@ class TimeApplication:
 
         return
 
-    # Close the application. Minimizes, then destroys, then exits
-    # in order to have three backup systems.
-    def close(self, event) -> None:
-        # Just in case
-        self.root.attributes('-fullscreen', False)
-
-        # Should work
-        self.root.destroy()
+    # Called by the application once per tick to update
+    # whichever screen this window is showing
+    def tick(self) -> None:
+        if self.current_screen == "first":
+            self.first_screen()
+        elif self.current_screen == "fourth":
+            self.fourth_screen()
+        elif self.current_screen == "fifth":
+            self.fifth_screen()
 
         return
 
     # Janky way to update the slider and its variable
     # every time it is moved
     def on_slider_change(self, event) -> None:
-        if self.outgoing != "":
-            self.root.after_cancel(self.outgoing)
-
         self.slider_var = self.slider.get()
 
         if self.time_mode != "NULL":
@@ -255,7 +237,7 @@ class TimeApplication:
     # notice the change over a short period of time.
     def now(self) -> None:
         self.time_mode = "NULL"
-        self.slider.set(time.time())
+        self.slider.set(self.app.now)
 
         if self.current_screen == "first":
             self.time_mode = "now"
@@ -274,9 +256,6 @@ class TimeApplication:
         # Create objects only if not previously set up
         # (this fixes flickering issue)
         if self.current_screen != "first":
-            if self.outgoing != "":
-                self.root.after_cancel(self.outgoing)
-
             # Clear screen
             self.clear()
 
@@ -327,7 +306,7 @@ class TimeApplication:
                 variable=self.slider_var,
                 command=self.on_slider_change,
                 length=1000,
-                value=time.time()
+                value=self.app.now
             )
             self.slider.pack()
 
@@ -359,7 +338,7 @@ class TimeApplication:
         # If in "now" mode, set current time to actual time.
         # Otherwise, set it to whatever the slider is set to.
         if self.time_mode == "now":
-            self.cur_time = int(time.time())
+            self.cur_time = int(self.app.now)
         else:
             self.cur_time = int(self.slider_var)
 
@@ -371,16 +350,10 @@ class TimeApplication:
         self.raw_time_label.config(text=str(self.cur_time))
         self.c_time_label.config(text=time.ctime(self.cur_time))
 
-        # After 1 second, call this function again
-        self.outgoing = self.root.after(1000, self.first_screen)
-
         return
 
     def second_screen(self) -> None:
         if self.current_screen != "second":
-            if self.outgoing != "":
-                self.root.after_cancel(self.outgoing)
-
             self.clear()
 
             ttk.Label(self.frame, text="What is binary?",
@@ -444,9 +417,6 @@ class TimeApplication:
 
     def third_screen(self) -> None:
         if self.current_screen != "third":
-            if self.outgoing != "":
-                self.root.after_cancel(self.outgoing)
-
             self.clear()
 
             ttk.Label(self.frame, text="Here are the first few binary numbers:\n", font=(
@@ -481,9 +451,6 @@ class TimeApplication:
     # and demonstrates it occuring in 2038.
     def fourth_screen(self) -> None:
         if self.current_screen != "fourth":
-            if self.outgoing != "":
-                self.root.after_cancel(self.outgoing)
-
             self.clear()
 
             ttk.Label(self.frame, text="The 2038 Problem",
@@ -534,7 +501,7 @@ class TimeApplication:
 
             self.current_screen = "fourth"
 
-        self.cur_time = int(time.time() % 20) + overflow_constant
+        self.cur_time = int(self.app.now % 20) + overflow_constant
         if self.cur_time >= pow(2, 31):
             self.cur_time -= pow(2, 32)
 
@@ -546,17 +513,11 @@ class TimeApplication:
         self.raw_time_label.config(text=str(self.cur_time))
         self.c_time_label.config(text=safe_ctime(self.cur_time))
 
-        # After 1 second, call this function again
-        self.outgoing = self.root.after(1000, self.fourth_screen)
-
         return
 
     # Demonstrates the "new" 64-bit integer representation of computer time
     def fifth_screen(self) -> None:
         if self.current_screen != "fifth":
-            if self.outgoing != "":
-                self.root.after_cancel(self.outgoing)
-
             # Clear screen
             self.clear()
 
@@ -641,7 +602,7 @@ class TimeApplication:
         # If in "now" mode, set current time to actual time.
         # Otherwise, set it to whatever the slider is set to.
         if self.time_mode == "now":
-            self.cur_time = int(time.time())
+            self.cur_time = int(self.app.now)
         else:
             self.cur_time = int(self.slider_var)
 
@@ -653,7 +614,161 @@ class TimeApplication:
         self.raw_time_label.config(text=str(self.cur_time))
         self.c_time_label.config(text=safe_ctime(self.cur_time))
 
+        return
+
+
+# The actual application running the computer time exhibit.
+# It owns the Tk root, the assets and the clock, and drives
+# one TimeWindow per entry of screens (for instance,
+# ["first", "fifth"] puts the 32-bit and 64-bit views side
+# by side on two monitors).
+
+
+class TimeApplication:
+    # Initialize all needed member variables
+    def __init__(self, screens: tuple = ("first",)) -> None:
+        # Create members, but do not start window yet
+        self.root: ThemedTk = ThemedTk(theme="breeze")
+
+        temp = list(font.families())
+        temp.sort()
+
+        if "Adelle" not in temp or "Amsi Pro Narw" not in temp:
+            print("Error: Font(s) not present! Installed fonts:")
+
+            for item in temp:
+                print("'" + item + "'")
+
+        self.screens: list = list(screens)
+
+        # Get screen dimensions. With several windows, the screen
+        # is split evenly between them, left to right.
+        self.w = self.root.winfo_screenwidth() // len(self.screens)
+        self.h = self.root.winfo_screenheight()
+
+        # Load the background once; every window shares it
+        try:
+            # Load unscaled image
+            temp = Image.open("images/bg.png")
+
+            # Calculate scaling factor as greatest of h and w scale factors
+            scale: float = 1.0
+
+            h_scale: float = (self.h + 10) / temp.height
+            w_scale: float = (self.w + 10) / temp.width
+
+            if h_scale > w_scale:
+                scale = h_scale
+            else:
+                scale = w_scale
+
+            # Rescale
+            temp = temp.resize(
+                size=(int(temp.width * scale), int(temp.height * scale)))
+            self.photo = ImageTk.PhotoImage(temp)
+
+        except:
+            print("Failed to open background image")
+            self.photo = None
+
+        # These images are mandatory to load, unlike the background
+        temp = Image.open("images/next_arrow.png")
+        temp = temp.resize(size=(64, 32))
+        self.next_arrow_photo = ImageTk.PhotoImage(temp)
+
+        temp = Image.open("images/restart_arrow.png")
+        temp = temp.resize(size=(64, 64))
+        self.prev_arrow_photo = ImageTk.PhotoImage(temp)
+
+        # Idle until SIGUSR1 or the hidden key chord
+        self.profiler = SamplingProfiler(self.root)
+        self.profiler.install()
+
+        # The time every window shows, computed once per tick
+        self.now: int = int(time.time())
+
+        # The first window uses the root itself, the rest get
+        # their own Toplevel placed on the next part of the screen
+        self.windows: list = []
+        for i in range(len(self.screens)):
+            if i == 0:
+                top = self.root
+            else:
+                top = tk.Toplevel(self.root)
+
+            if len(self.screens) > 1:
+                top.geometry("+" + str(i * self.w) + "+0")
+
+            self.windows.append(TimeWindow(self, top))
+
+        self.outgoing = ""
+
+        return
+
+    # Show each window's starting screen, then start the clock
+    def start(self) -> None:
+        for window, screen in zip(self.windows, self.screens):
+            getattr(window, screen + "_screen")()
+
+        self.tick()
+
+        return
+
+    # The one scheduler for every window: get the time once,
+    # update all the windows with it, then wait a second
+    def tick(self) -> None:
+        self.now = int(time.time())
+
+        for window in self.windows:
+            window.tick()
+
         # After 1 second, call this function again
-        self.outgoing = self.root.after(1000, self.fifth_screen)
+        self.outgoing = self.root.after(1000, self.tick)
+
+        return
+
+    # Close the application. Minimizes, then destroys, then exits
+    # in order to have three backup systems.
+    def close(self, event) -> None:
+        if self.outgoing != "":
+            self.root.after_cancel(self.outgoing)
+
+        # Save any profile being taken; its scheduled end would
+        # never run once the root is gone
+        if self.profiler.active:
+            self.profiler.stop()
+
+        # Just in case
+        for window in self.windows:
+            window.root.attributes('-fullscreen', False)
+
+        # Report before the images go away with the root
+        self.report_usage()
+
+        # Should work (this also destroys the other windows)
+        self.root.destroy()
+
+        return
+
+    # Print what this run cost, when several windows share it.
+    # To compare against one process per window, run
+    # `python3 benchmark.py` with the same screens.
+    def report_usage(self) -> None:
+        count: int = len(self.windows)
+
+        if count < 2:
+            return
+
+        # Decoded PhotoImages take 4 bytes per pixel in Tk
+        images: int = 0
+        for photo in [self.photo, self.next_arrow_photo, self.prev_arrow_photo]:
+            if photo is not None:
+                images += photo.width() * photo.height() * 4
+
+        print("Ran " + str(count) + " windows in one process: "
+              + megabytes(memory_used()) + " memory, "
+              + str(round(time.process_time(), 2)) + " s CPU, "
+              + megabytes(images) + " of decoded images shared by all"
+              + " windows.")
 
         return
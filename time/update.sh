@@ -7,31 +7,15 @@
 echo "This script updates the time exhibit when run."
 echo "jdehmel@outlook.com, 2023"
 
-# Check for wifi
-if ! ping google.com -c 1 > /dev/null ; then echo "ERROR: No internet connection!" ; fi
+# Start a fresh log for this run
+echo "Update started $(date)" > log.txt
 
-# Pull from git
-echo "Checking for project updates..."
-git pull > log.txt
+# Only pull, reinstall and recache what actually changed.
+# Pass --bundle /path/to/bundle to update without internet,
+# or --force to redo every step.
+python3 -u ./updater.py "$@" | tee -a log.txt
 
-# Make main.py and this update script executable
+# Make main.py and the update scripts executable
 # so you can just double click on them if needed
 echo "Fixing permissions..."
-chmod +x ./main.py >> log.txt
-chmod +x ./update.sh >> log.txt
-
-# Ensure all Python dependancies are met on the system level
-echo "Ensuring Python is up to date (this may take a while)..."
-sudo apt-get install -y python3 python-tk python3-pil.imagetk
-
-# Ensure all Python dependancies are met on the PIP level
-echo "Installing Python packages (this may take a while)..."
-sudo pip install ttkthemes pillow
-
-# Install fonts
-echo "Installing fonts..."
-sudo mkdir -p ~/.local/share/fonts
-sudo cp fonts/* ~/.local/share/fonts
-fc-cache -vf
-
-echo "Done."
+chmod +x ./main.py ./update.sh ./updater.py >> log.txt
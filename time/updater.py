@@ -0,0 +1,463 @@
+#!/usr/bin/python3
+# The above line allows this file to be executable (shebang)
+
+# Jordan Dehmel, 2023
+# jdehmel@outlook.com
+# jedehmel@mavs.coloradomesa.edu
+
+'''
+Incremental updater for the time exhibit. This does the
+same job as the old update.sh, but only does the slow
+parts when they are actually needed, and works without
+internet if you bring the update on a USB stick.
+
+Each exhibit file is identified by its content hash (the
+same hash git uses), so only files which actually changed
+are copied. Reinstalling packages is skipped unless
+packages.txt changed, and the font cache is only rebuilt
+when a font changed.
+
+Usage:
+    python3 updater.py
+        Update from the git remote (the normal case)
+    python3 updater.py --bundle /media/pi/USB/time
+        Update from a bundle folder (no internet needed)
+    python3 updater.py --make-bundle /media/pi/USB/time
+        Write a bundle of this copy of the exhibit
+    python3 updater.py --force
+        Redo every step, like the old update.sh did
+'''
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+
+# This file uses Python's type hinting as much as possible
+
+# The folder this exhibit lives in
+here: str = os.path.dirname(os.path.abspath(__file__))
+
+# Everything which makes up the exhibit, relative to `here`
+exhibit_paths: list = ["main.py", "time_driver.py", "profiler.py",
+                       "benchmark.py", "updater.py", "update.sh",
+                       "packages.txt", "images", "fonts"]
+
+# The manifest stored at the top of a bundle
+manifest_name: str = "manifest.json"
+
+# What this updater remembers between runs
+state_path: str = os.path.join(here, ".update_state.json")
+
+# Where fonts get installed for the pi user
+font_dir: str = os.path.expanduser("~/.local/share/fonts")
+
+
+# Get the content hash of some bytes. This is the same as git's
+# blob hash, so local files can be compared to `git ls-tree`.
+def blob_hash(data: bytes) -> str:
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+
+    return h.hexdigest()
+
+
+# Get the manifest entry for a single file
+def hash_file(path: str) -> dict:
+    with open(path, "rb") as file:
+        data: bytes = file.read()
+
+    return {"hash": blob_hash(data), "size": len(data)}
+
+
+# Build a manifest of every exhibit file under root, mapping
+# the (forward-slashed) relative path to its hash and size
+def build_manifest(root: str) -> dict:
+    out: dict = {}
+
+    for path in exhibit_paths:
+        full: str = os.path.join(root, path)
+
+        if os.path.isdir(full):
+            for dirpath, dirnames, filenames in os.walk(full):
+                dirnames.sort()
+
+                for name in sorted(filenames):
+                    file_path: str = os.path.join(dirpath, name)
+                    rel: str = os.path.relpath(file_path, root)
+                    out[rel.replace(os.sep, "/")] = hash_file(file_path)
+
+        elif os.path.isfile(full):
+            out[path] = hash_file(full)
+
+    return out
+
+
+# Check that a manifest path is one of the exhibit files and
+# stays inside the exhibit folder (no "..", no absolute paths)
+def is_exhibit_path(path: str) -> bool:
+    if os.path.isabs(path) or path.split("/")[0] not in exhibit_paths:
+        return False
+
+    full: str = os.path.realpath(os.path.join(here, path))
+
+    return full.startswith(os.path.realpath(here) + os.sep)
+
+
+# Get the paths whose contents differ between two manifests.
+# Files which only exist locally are left alone.
+def changed_paths(local: dict, remote: dict) -> list:
+    out: list = []
+
+    for path, entry in sorted(remote.items()):
+        if path not in local or local[path]["hash"] != entry["hash"]:
+            out.append(path)
+
+    return out
+
+
+# Combine the manifest entries under some prefix into a single
+# hash, used to tell if a step's inputs changed
+def input_hash(manifest: dict, prefix: str) -> str:
+    h = hashlib.sha1()
+
+    for path in sorted(manifest):
+        if path == prefix or path.startswith(prefix + "/"):
+            h.update((path + " " + manifest[path]["hash"] + "\n").encode())
+
+    return h.hexdigest()
+
+
+# Load what the last run recorded, or a blank state if this
+# is the first run (or the state file is damaged)
+def load_state() -> dict:
+    state: dict = {"inputs": {}, "seconds": {}}
+
+    try:
+        with open(state_path) as file:
+            state.update(json.load(file))
+    except (OSError, ValueError):
+        pass
+
+    return state
+
+
+def save_state(state: dict) -> None:
+    with open(state_path, "w") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+
+    return
+
+
+# Run a git command in the exhibit folder, returning its output
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], cwd=here, check=True,
+                          capture_output=True, text=True).stdout
+
+
+# Get how many bytes git's object store takes up, loose objects
+# and packs together
+def git_object_bytes() -> int:
+    sizes: dict = {}
+
+    for line in git("count-objects", "-v").splitlines():
+        key, value = line.split(":", 1)
+        sizes[key] = value.strip()
+
+    # Both are given in KiB
+    return (int(sizes.get("size", 0)) + int(sizes.get("size-pack", 0))) * 1024
+
+
+# Update from the git remote. Fetching is already incremental,
+# and the fast-forward only rewrites the files which changed.
+# Returns the changed paths, or None if git could not be used
+# (for instance, because there is no internet).
+def update_from_git(local: dict, report: dict) -> list:
+    try:
+        before: int = git_object_bytes()
+        git("fetch", "--quiet")
+        report["transferred"] += max(git_object_bytes() - before, 0)
+
+        upstream: str = git("rev-parse", "--abbrev-ref", "@{upstream}").strip()
+        behind: str = git("rev-list", "--count", "HEAD.." + upstream).strip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print("Could not reach the git remote, skipping it:",
+              getattr(e, "stderr", "") or e)
+        return None
+
+    # Any new upstream commit is pulled in, even if it only
+    # touches files the exhibit does not track
+    if behind == "0":
+        return []
+
+    try:
+        git("merge", "--ff-only", "--quiet", upstream)
+    except subprocess.CalledProcessError as e:
+        print("Could not fast-forward to " + upstream + ":", e.stderr)
+        return None
+
+    # The manifests only decide which caches to throw away and
+    # what to report
+    updated: dict = build_manifest(here)
+    changed: list = changed_paths(local, updated)
+
+    report["bytes"] += sum(updated[path]["size"] for path in changed)
+
+    return changed
+
+
+# Update from a bundle folder (for instance, on a USB stick).
+# Only the files whose hashes differ are copied.
+def update_from_bundle(bundle: str, local: dict, report: dict) -> list:
+    # Trust the bundle's manifest if it has one, so unchanged
+    # files never have to be read off the stick
+    try:
+        with open(os.path.join(bundle, manifest_name)) as file:
+            remote: dict = json.load(file)
+    except (OSError, ValueError):
+        remote = build_manifest(bundle)
+
+    for path in remote:
+        if not is_exhibit_path(path):
+            print("Bundle manifest lists '" + path + "', which is not an"
+                  + " exhibit file. Nothing was changed.")
+            return None
+
+    changed: list = changed_paths(local, remote)
+
+    # Read and check every changed file before replacing any, so
+    # a bad bundle can never leave the exhibit half-updated
+    contents: dict = {}
+    for path in changed:
+        try:
+            with open(os.path.join(bundle, path), "rb") as file:
+                contents[path] = file.read()
+        except OSError as e:
+            print("Could not read '" + path + "' from the bundle ("
+                  + str(e) + "). Nothing was changed.")
+            return None
+
+        if blob_hash(contents[path]) != remote[path]["hash"]:
+            print("'" + path + "' in the bundle does not match its"
+                  + " manifest (corrupt copy?). Nothing was changed.")
+            return None
+
+    for path in changed:
+        dest: str = os.path.join(here, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+
+        # Write next to the destination, then swap it in, so the
+        # exhibit never sees a half-written file. USB sticks often
+        # lose the executable bit, so keep the mode already here.
+        with open(dest + ".new", "wb") as file:
+            file.write(contents[path])
+        if os.path.exists(dest):
+            shutil.copymode(dest, dest + ".new")
+        else:
+            shutil.copymode(os.path.join(bundle, path), dest + ".new")
+        os.replace(dest + ".new", dest)
+
+        report["bytes"] += len(contents[path])
+        report["transferred"] += len(contents[path])
+
+    return changed
+
+
+# Write a bundle of this copy of the exhibit, with a manifest
+def make_bundle(dest: str) -> None:
+    manifest: dict = build_manifest(here)
+
+    for path in manifest:
+        target: str = os.path.join(dest, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(os.path.join(here, path), target)
+
+    with open(os.path.join(dest, manifest_name), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+    print("Wrote " + str(len(manifest)) + " files to " + dest)
+
+    return
+
+
+# Throw away caches made from files that changed. Python only
+# checks a source file's size and modification time (to the
+# second) against its bytecode, and a Pi has no real-time clock
+# to keep that time trustworthy offline, so a same-sized change
+# could otherwise keep running stale bytecode.
+def invalidate_caches(changed: list) -> None:
+    for path in changed:
+        if not path.endswith(".py"):
+            continue
+
+        folder, name = os.path.split(os.path.join(here, path))
+        cache: str = os.path.join(folder, "__pycache__")
+
+        if not os.path.isdir(cache):
+            continue
+
+        for item in os.listdir(cache):
+            if item.startswith(name[:-3] + "."):
+                os.remove(os.path.join(cache, item))
+
+    return
+
+
+# Ensure all Python dependancies are met on the system and PIP level
+def install_packages() -> None:
+    packages: dict = {}
+
+    with open(os.path.join(here, "packages.txt")) as file:
+        for line in file:
+            if ":" in line and not line.startswith("#"):
+                kind, names = line.split(":", 1)
+                packages[kind.strip()] = names.split()
+
+    subprocess.run(["sudo", "apt-get", "install", "-y",
+                    *packages.get("apt", [])], check=True)
+    subprocess.run(["sudo", "pip", "install", *packages.get("pip", [])],
+                   check=True)
+
+    return
+
+
+# Copy over only the fonts which differ from the installed
+# ones, then rebuild the font cache for that folder alone
+def install_fonts() -> None:
+    for name in sorted(os.listdir(os.path.join(here, "fonts"))):
+        source: str = os.path.join(here, "fonts", name)
+        dest: str = os.path.join(font_dir, name)
+
+        if not os.path.isfile(dest) or hash_file(dest) != hash_file(source):
+            copy_font(source, dest)
+
+    subprocess.run(["fc-cache", "-f", font_dir], check=True)
+
+    return
+
+
+# Copy one font into place. The old update.sh installed fonts
+# with sudo, so on older kiosks the font folder belongs to root;
+# fall back to sudo there, like it did.
+def copy_font(source: str, dest: str) -> None:
+    try:
+        os.makedirs(font_dir, exist_ok=True)
+        shutil.copy2(source, dest)
+        return
+    except PermissionError:
+        pass
+
+    try:
+        subprocess.run(["sudo", "mkdir", "-p", font_dir], check=True)
+        subprocess.run(["sudo", "cp", source, dest], check=True)
+    except (OSError, subprocess.CalledProcessError):
+        raise OSError("Could not install " + os.path.basename(source)
+                      + " into " + font_dir + ", even with sudo. Try"
+                      + " `sudo chown -R $USER " + font_dir + "`.")
+
+    return
+
+
+# Run a slow step only if its inputs changed since it last
+# succeeded, keeping track of how long it takes
+def run_step(name: str, step, inputs: str, state: dict,
+             force: bool, report: dict) -> None:
+    if not force and state["inputs"].get(name) == inputs:
+        report["skipped"].append(name)
+        report["saved"] += state["seconds"].get(name, 0.0)
+        return
+
+    print("Running step '" + name + "'...")
+    start: float = time.monotonic()
+
+    try:
+        step()
+    except (OSError, subprocess.CalledProcessError) as e:
+        # Leave the old inputs so this is retried next time
+        print("Step '" + name + "' failed:", e)
+        return
+
+    state["inputs"][name] = inputs
+    state["seconds"][name] = time.monotonic() - start
+    report["ran"].append(name)
+
+    return
+
+
+# Format a number of seconds like "3m 05s"
+def format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+
+    if minutes == 0:
+        return str(seconds) + "s"
+
+    return str(minutes) + "m " + str(seconds).zfill(2) + "s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Incrementally update the time exhibit.")
+    parser.add_argument("--bundle", metavar="DIR",
+                        help="update from a bundle folder instead of git")
+    parser.add_argument("--make-bundle", metavar="DIR",
+                        help="write a bundle of this exhibit and exit")
+    parser.add_argument("--force", action="store_true",
+                        help="redo every step, even if nothing changed")
+    args = parser.parse_args()
+
+    if args.make_bundle:
+        make_bundle(args.make_bundle)
+        return
+
+    report: dict = {"bytes": 0, "transferred": 0, "saved": 0.0,
+                    "ran": [], "skipped": []}
+    state: dict = load_state()
+    local: dict = build_manifest(here)
+
+    if args.bundle:
+        print("Checking " + args.bundle + " for project updates...")
+        changed = update_from_bundle(args.bundle, local, report)
+    else:
+        print("Checking for project updates...")
+        changed = update_from_git(local, report)
+
+    if changed is None:
+        # A bad bundle is a mistake to fix, not something to
+        # carry on past like a missing internet connection
+        if args.bundle:
+            return
+
+        changed = []
+
+    invalidate_caches(changed)
+
+    # Step inputs come from what is on disk now, updated or not
+    local = build_manifest(here)
+
+    run_step("packages", install_packages, input_hash(local, "packages.txt"),
+             state, args.force, report)
+    run_step("fonts", install_fonts, input_hash(local, "fonts"),
+             state, args.force, report)
+
+    save_state(state)
+
+    print("Updated " + str(len(changed)) + " of " + str(len(local))
+          + " files (" + str(report["bytes"]) + " bytes of changed files, "
+          + str(report["transferred"]) + " bytes transferred).")
+    for path in changed:
+        print("    " + path)
+
+    if report["skipped"]:
+        print("Skipped unchanged steps: " + ", ".join(report["skipped"])
+              + " (about " + format_seconds(report["saved"]) + " saved).")
+
+    print("Done.")
+
+    return
+
+
+if __name__ == '__main__':
+    main()